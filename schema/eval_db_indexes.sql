@@ -0,0 +1,22 @@
+-- Secondary indexes for the Epic #234 collaboration_tags extension.
+--
+-- Kept separate from eval_db_schema.sql so bulk imports can create the
+-- table first (apply_schema.py --no-indexes), load rows, and then build
+-- the indexes afterwards — one sort-and-build per index is far cheaper
+-- than incremental B-tree maintenance on every inserted row.
+--
+-- USAGE: applied by apply_schema.py after eval_db_schema.sql (the default),
+--        or on its own to index an already-populated database.
+
+CREATE INDEX IF NOT EXISTS idx_collab_event ON collaboration_tags(event_id);
+CREATE INDEX IF NOT EXISTS idx_collab_session ON collaboration_tags(tagged_session_id);
+CREATE INDEX IF NOT EXISTS idx_collab_tagger ON collaboration_tags(tagger_id);
+CREATE INDEX IF NOT EXISTS idx_collab_iteration ON collaboration_tags(is_followup, is_correction);
+CREATE INDEX IF NOT EXISTS idx_collab_anti_pattern ON collaboration_tags(anti_pattern_detected, anti_pattern_type);
+CREATE INDEX IF NOT EXISTS idx_collab_outcome ON collaboration_tags(outcome_observed);
+CREATE INDEX IF NOT EXISTS idx_collab_request_type ON collaboration_tags(request_type);
+
+-- Covering index for add_tags.py's per-tagger version map
+-- (SELECT event_id, MAX(tag_version) ... WHERE tagger_id = ? GROUP BY event_id):
+-- index-only scan, no temp B-tree for the GROUP BY
+CREATE INDEX IF NOT EXISTS idx_collab_tagger_event_ver ON collaboration_tags(tagger_id, event_id, tag_version);
@@ -222,13 +222,9 @@ ORDER BY event_count DESC;
 -- INDEXES FOR PERFORMANCE
 -- ============================================================================
 
-CREATE INDEX IF NOT EXISTS idx_collab_event ON collaboration_tags(event_id);
-CREATE INDEX IF NOT EXISTS idx_collab_session ON collaboration_tags(tagged_session_id);
-CREATE INDEX IF NOT EXISTS idx_collab_tagger ON collaboration_tags(tagger_id);
-CREATE INDEX IF NOT EXISTS idx_collab_iteration ON collaboration_tags(is_followup, is_correction);
-CREATE INDEX IF NOT EXISTS idx_collab_anti_pattern ON collaboration_tags(anti_pattern_detected, anti_pattern_type);
-CREATE INDEX IF NOT EXISTS idx_collab_outcome ON collaboration_tags(outcome_observed);
-CREATE INDEX IF NOT EXISTS idx_collab_request_type ON collaboration_tags(request_type);
+-- Secondary indexes live in eval_db_indexes.sql so bulk loads can apply
+-- tables first (apply_schema.py --no-indexes), import, then add indexes
+-- in one sort-and-build pass instead of per-row B-tree maintenance.
 
 -- ============================================================================
 -- SCHEMA VERSION
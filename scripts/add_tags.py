@@ -14,10 +14,237 @@ Examples:
 """
 
 import argparse
+import mmap
+import operator
+import queue
 import sqlite3
-import json
+import threading
 from pathlib import Path
 
+import fastjson
+from db_utils import tune_connection
+
+
+# Commit every N imported rows so a huge import doesn't grow one giant journal
+COMMIT_INTERVAL = 10000
+
+# Chunk size for IN (...) lookups; SQLite's default variable limit is 999
+LOOKUP_CHUNK = 500
+
+# Rows per executemany call on the consumer side
+BATCH_SIZE = 1000
+
+# Bound on parsed-but-not-yet-inserted rows between the two threads
+QUEUE_SIZE = 2000
+
+# Tag fields in INSERT column order ('session_id' maps to tagged_session_id)
+TAG_FIELDS = (
+    'is_new_request',
+    'session_id',
+    'request_sequence',
+    'is_followup',
+    'is_correction',
+    'iteration_type',
+    'request_type',
+    'expected_outcome',
+    'expected_first_pass_success',
+    'outcome_observed',
+    'outcome_notes',
+    'anti_pattern_detected',
+    'anti_pattern_type',
+    'preventive_instruction',
+    'preventive_instruction_was_routed',
+    'context_sufficient',
+    'missing_context',
+    'agent_response',
+    'agent_response_source',
+    'confidence',
+    'notes',
+    'requires_agent_response',
+)
+
+# JSONL tag field -> collaboration_tags column; identical except session_id
+TAG_COLUMNS = {field: field for field in TAG_FIELDS}
+TAG_COLUMNS['session_id'] = 'tagged_session_id'
+
+
+def _make_insert_sql() -> str:
+    """Generate the INSERT statement from the declarative field list.
+
+    Keeping TAG_FIELDS as the single source of truth means adding a tag
+    field is a one-line change: the column list, placeholders, and bind
+    tuple all derive from it.
+    """
+    columns = ['event_id'] + [TAG_COLUMNS[f] for f in TAG_FIELDS] + ['tagger_id', 'tag_version']
+    placeholders = ', '.join('?' * len(columns))
+    return f"INSERT INTO collaboration_tags ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+INSERT_SQL = _make_insert_sql()
+
+# C-implemented bulk getter: one call pulls all tag values as a tuple
+_tag_values = operator.itemgetter(*TAG_FIELDS)
+
+
+def _param_row(event_id: str, tags: dict, tagger_id: str, tag_version: int) -> tuple:
+    """Build the bind tuple for one collaboration_tags INSERT."""
+    for field in TAG_FIELDS:
+        tags.setdefault(field, None)
+    return (event_id, *_tag_values(tags), tagger_id, tag_version)
+
+
+def _iter_lines(input_path: Path):
+    """Yield raw JSONL lines as bytes, decompressing by extension.
+
+    Compressed exports (.gz / .zst, see export_for_tagging --compress) are
+    streamed through the matching decompressor. Plain files go through
+    mmap: find() uses memchr-speed scanning and slicing skips the text
+    decode + str-per-line allocation of text-mode iteration. Either way
+    the parser accepts the bytes directly.
+    """
+    suffix = input_path.suffix
+    if suffix == '.gz':
+        import gzip
+        with gzip.open(input_path, 'rb') as f:
+            yield from f
+        return
+    if suffix == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit(
+                "zstd input requires the zstandard package (pip install zstandard)"
+            )
+        import io
+        with open(input_path, 'rb') as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                raw, read_across_frames=True
+            )
+            yield from io.BufferedReader(reader)
+        return
+
+    with open(input_path, 'rb') as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+        try:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b'\n', start)
+                if end == -1:
+                    yield mm[start:]
+                    break
+                yield mm[start:end]
+                start = end + 1
+        finally:
+            mm.close()
+
+
+def _parse_lines(input_path: Path, out_queue: queue.Queue, stats: dict):
+    """Producer thread: parse JSONL lines and feed the import queue.
+
+    Runs concurrently with the consumer's SQLite work (which releases the
+    GIL inside execute), so parsing overlaps inserting. A None sentinel
+    marks end of input; if the producer itself dies (e.g. a truncated
+    compressed file), the exception is enqueued instead so the consumer
+    re-raises it rather than mistaking the crash for end-of-input and
+    reporting a partial import as success.
+    """
+    try:
+        for line_num, line in enumerate(_iter_lines(input_path), 1):
+            stats['total'] += 1
+
+            try:
+                data = fastjson.loads(line)
+            except ValueError as e:
+                stats['errors'].append(f"Line {line_num}: JSON parse error - {e}")
+                continue
+
+            if not isinstance(data, dict):
+                stats['errors'].append(
+                    f"Line {line_num}: Expected a JSON object, got {type(data).__name__}"
+                )
+                continue
+
+            # No fallback dict: a row without a tags object is an input
+            # error, and substituting {} would insert an all-NULL tag row.
+            # Anything but a dict is rejected here — _param_row assumes one,
+            # and a single bad line must not abort the whole import.
+            tags = data.get('tags')
+            if tags is None:
+                stats['errors'].append(f"Line {line_num}: Missing 'tags'")
+                continue
+            if not isinstance(tags, dict):
+                stats['errors'].append(
+                    f"Line {line_num}: 'tags' must be an object, got {type(tags).__name__}"
+                )
+                continue
+
+            out_queue.put((line_num, data.get('event_id', ''), tags))
+    except BaseException as e:
+        out_queue.put(e)
+        raise
+    else:
+        out_queue.put(None)
+
+
+def _import_pending(cursor, stats: dict, versions: dict, tagger_id: str,
+                    pending: list) -> int:
+    """Resolve existence for one batch of parsed rows and insert them.
+
+    Returns the number of rows handed to the INSERT (for commit pacing).
+    """
+    existing = set()
+    ids = [event_id for _, event_id, _ in pending]
+    for i in range(0, len(ids), LOOKUP_CHUNK):
+        chunk = ids[i:i + LOOKUP_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(
+            f"SELECT event_id FROM evaluation_dataset WHERE event_id IN ({placeholders})",
+            chunk
+        )
+        existing.update(r[0] for r in cursor.fetchall())
+
+    batch = []
+    for line_num, event_id, tags in pending:
+        if event_id not in existing:
+            stats['event_not_found'] += 1
+            continue
+
+        versions[event_id] = versions.get(event_id, 0) + 1
+        batch.append((line_num, _param_row(event_id, tags, tagger_id, versions[event_id])))
+
+    if batch:
+        _insert_batch(cursor, stats, batch)
+    return len(batch)
+
+
+def _insert_batch(cursor, stats: dict, batch: list):
+    """Insert a batch via executemany, falling back to per-row inserts.
+
+    batch holds (line_num, params) pairs; executemany consumes the param
+    tuples through a generator, so no second parallel list of rows is
+    materialized. The pairs themselves stay around because the fallback
+    path replays them row-by-row — inside a savepoint, so a failed
+    executemany leaves no partial rows behind and errors get line numbers.
+    """
+    cursor.execute("SAVEPOINT tag_batch")
+    try:
+        cursor.executemany(INSERT_SQL, (params for _, params in batch))
+        stats['imported'] += len(batch)
+    except Exception:
+        cursor.execute("ROLLBACK TO tag_batch")
+        for line_num, params in batch:
+            try:
+                cursor.execute(INSERT_SQL, params)
+                stats['imported'] += 1
+            except Exception as e:
+                stats['errors'].append(f"Line {line_num}: Insert error - {e}")
+    cursor.execute("RELEASE tag_batch")
+
 
 def add_tags_from_jsonl(
     db_path: Path,
@@ -25,12 +252,17 @@ def add_tags_from_jsonl(
     tagger_id: str
 ) -> dict:
     """Import collaboration tags from JSONL file.
-    
+
+    All inserts run inside one explicit transaction (committed every
+    COMMIT_INTERVAL rows) instead of sqlite3's implicit per-statement
+    transactions, so the import pays one fsync per batch rather than
+    one per row.
+
     Args:
         db_path: Path to evaluation_results.db
         input_path: Path to JSONL file with tags
         tagger_id: Identifier for who/what tagged (e.g., 'llm:codex')
-        
+
     Returns:
         Dict with import statistics
     """
@@ -40,112 +272,76 @@ def add_tags_from_jsonl(
         'event_not_found': 0,
         'errors': []
     }
-    
-    conn = sqlite3.connect(db_path)
+
+    # isolation_level=None disables the implicit transaction machinery
+    # (we manage BEGIN/COMMIT explicitly below); check_same_thread=False
+    # because the connection lives alongside the parse thread.
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    tune_connection(conn)
     cursor = conn.cursor()
+
+    # Hold the file lock for the whole import instead of re-acquiring it
+    # per commit; restored to NORMAL before closing
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
     
-    # Verify collaboration_tags table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='collaboration_tags'")
-    if not cursor.fetchone():
-        stats['errors'].append(
-            "collaboration_tags table not found. Run: python scripts/apply_schema.py --db PATH"
+    # Current max tag_version per event for this tagger; incremented in Python
+    # as rows are queued so repeated event_ids in one file version correctly.
+    # This is also where a missing collaboration_tags table surfaces — no
+    # separate sqlite_master probe needed.
+    try:
+        cursor.execute(
+            "SELECT event_id, MAX(tag_version) FROM collaboration_tags WHERE tagger_id = ? GROUP BY event_id",
+            (tagger_id,)
         )
-        conn.close()
-        return stats
-    
-    with open(input_path) as f:
-        for line_num, line in enumerate(f, 1):
-            stats['total'] += 1
-            
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError as e:
-                stats['errors'].append(f"Line {line_num}: JSON parse error - {e}")
-                continue
-            
-            event_id = data.get('event_id', '')
-            tags = data.get('tags', {})
-            
-            # Verify event exists in evaluation_dataset
-            cursor.execute(
-                "SELECT event_id FROM evaluation_dataset WHERE event_id = ?",
-                (event_id,)
-            )
-            if not cursor.fetchone():
-                stats['event_not_found'] += 1
-                continue
-            
-            # Get next tag version for this event+tagger
-            cursor.execute(
-                "SELECT COALESCE(MAX(tag_version), 0) + 1 FROM collaboration_tags WHERE event_id = ? AND tagger_id = ?",
-                (event_id, tagger_id)
+        versions = dict(cursor.fetchall())
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            stats['errors'].append(
+                "collaboration_tags table not found. Run: python scripts/apply_schema.py --db PATH"
             )
-            next_version = cursor.fetchone()[0]
-            
-            try:
-                cursor.execute("""
-                    INSERT INTO collaboration_tags (
-                        event_id,
-                        is_new_request,
-                        tagged_session_id,
-                        request_sequence,
-                        is_followup,
-                        is_correction,
-                        iteration_type,
-                        request_type,
-                        expected_outcome,
-                        expected_first_pass_success,
-                        outcome_observed,
-                        outcome_notes,
-                        anti_pattern_detected,
-                        anti_pattern_type,
-                        preventive_instruction,
-                        preventive_instruction_was_routed,
-                        context_sufficient,
-                        missing_context,
-                        agent_response,
-                        agent_response_source,
-                        confidence,
-                        notes,
-                        requires_agent_response,
-                        tagger_id,
-                        tag_version
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    event_id,
-                    tags.get('is_new_request'),
-                    tags.get('session_id'),  # Maps to tagged_session_id
-                    tags.get('request_sequence'),
-                    tags.get('is_followup'),
-                    tags.get('is_correction'),
-                    tags.get('iteration_type'),
-                    tags.get('request_type'),
-                    tags.get('expected_outcome'),
-                    tags.get('expected_first_pass_success'),
-                    tags.get('outcome_observed'),
-                    tags.get('outcome_notes'),
-                    tags.get('anti_pattern_detected'),
-                    tags.get('anti_pattern_type'),
-                    tags.get('preventive_instruction'),
-                    tags.get('preventive_instruction_was_routed'),
-                    tags.get('context_sufficient'),
-                    tags.get('missing_context'),
-                    tags.get('agent_response'),
-                    tags.get('agent_response_source'),
-                    tags.get('confidence'),
-                    tags.get('notes'),
-                    tags.get('requires_agent_response'),
-                    tagger_id,
-                    next_version
-                ))
-                stats['imported'] += 1
-                
-            except Exception as e:
-                stats['errors'].append(f"Line {line_num}: Insert error - {e}")
-    
-    conn.commit()
+            conn.close()
+            return stats
+        raise
+
+    # Producer thread parses the JSONL while this thread runs the inserts
+    parsed = queue.Queue(maxsize=QUEUE_SIZE)
+    producer = threading.Thread(
+        target=_parse_lines, args=(input_path, parsed, stats), daemon=True
+    )
+    producer.start()
+
+    cursor.execute("BEGIN IMMEDIATE")
+
+    pending = []  # (line_num, event_id, tags)
+    since_commit = 0
+    while True:
+        item = parsed.get()
+        if item is None:
+            break
+        if isinstance(item, BaseException):
+            # Producer died mid-file; surface its exception here instead of
+            # committing a silent partial import
+            raise item
+
+        pending.append(item)
+        if len(pending) >= BATCH_SIZE:
+            since_commit += _import_pending(cursor, stats, versions, tagger_id, pending)
+            pending = []
+
+            # Bound journal growth on very large imports
+            if since_commit >= COMMIT_INTERVAL:
+                cursor.execute("COMMIT")
+                cursor.execute("BEGIN IMMEDIATE")
+                since_commit = 0
+
+    if pending:
+        _import_pending(cursor, stats, versions, tagger_id, pending)
+
+    producer.join()
+    cursor.execute("COMMIT")
+    cursor.execute("PRAGMA locking_mode=NORMAL")
     conn.close()
-    
+
     return stats
 
 
@@ -13,92 +13,179 @@ import argparse
 import sqlite3
 from pathlib import Path
 
+from db_utils import tune_connection
+
 SCHEMA_PATH = Path(__file__).parent.parent / 'schema' / 'eval_db_schema.sql'
+INDEXES_PATH = Path(__file__).parent.parent / 'schema' / 'eval_db_indexes.sql'
+
+
+def _split_statements(sql: str) -> list:
+    """Split a SQL script into statements on top-level semicolons.
+
+    Respects single-quoted strings ('' escapes) and -- line comments,
+    which covers this schema file (no triggers or BEGIN...END blocks).
+    """
+    statements = []
+    start = 0
+    in_string = False
+    in_comment = False
+    i = 0
+    n = len(sql)
+    while i < n:
+        c = sql[i]
+        if in_string:
+            if c == "'":
+                if i + 1 < n and sql[i + 1] == "'":
+                    i += 1
+                else:
+                    in_string = False
+        elif in_comment:
+            if c == '\n':
+                in_comment = False
+        elif c == "'":
+            in_string = True
+        elif c == '-' and sql[i:i + 2] == '--':
+            in_comment = True
+        elif c == ';':
+            stmt = sql[start:i].strip()
+            if stmt:
+                statements.append(stmt)
+            start = i + 1
+        i += 1
+    tail = sql[start:].strip()
+    if tail:
+        statements.append(tail)
+    return statements
 
 
-def apply_schema(db_path: Path) -> dict:
+def _load_statements(include_indexes: bool = True) -> list:
+    """Read and split the schema script(s) into executable statements.
+
+    Indexes live in their own file so bulk loads can skip them up front
+    and build them after the data is in (see eval_db_indexes.sql).
+    """
+    statements = _split_statements(SCHEMA_PATH.read_text())
+    if include_indexes:
+        statements += _split_statements(INDEXES_PATH.read_text())
+    return statements
+
+
+def apply_schema(db_path: Path, statements: list = None,
+                 include_indexes: bool = True) -> dict:
     """Apply Epic #234 schema extension to existing evaluation database.
-    
+
     Args:
         db_path: Path to evaluation_results.db
-        
+        statements: Pre-split schema statements; parsed from the schema
+            files when omitted. Passing them in lets bulk callers parse once.
+        include_indexes: Also create the secondary indexes (default). Pass
+            False before a bulk import and re-apply afterwards.
+
     Returns:
         Dict with application results
     """
+    if statements is None:
+        statements = _load_statements(include_indexes)
     results = {
-        'tables_before': [],
-        'tables_after': [],
+        'tables': [],
         'views_created': [],
         'indexes_created': [],
         'errors': []
     }
-    
-    conn = sqlite3.connect(db_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    tune_connection(conn)
     cursor = conn.cursor()
-    
-    # Check existing tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    results['tables_before'] = [row[0] for row in cursor.fetchall()]
-    
-    # Verify evaluation_dataset exists
-    if 'evaluation_dataset' not in results['tables_before']:
+
+    # Verify evaluation_dataset exists (targeted probe; the schema is
+    # idempotent via IF NOT EXISTS, so no full table listing is needed)
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='evaluation_dataset'"
+    )
+    if not cursor.fetchone():
         results['errors'].append(
             "evaluation_dataset table not found. This schema extends the existing eval schema. "
             "See docs/observability/evaluation_schema.sql"
         )
         conn.close()
         return results
-    
-    # Read and apply schema
-    schema_sql = SCHEMA_PATH.read_text()
-    
+
+    # Apply the pre-split schema statements in one transaction
     try:
-        conn.executescript(schema_sql)
-        conn.commit()
+        cursor.execute("BEGIN")
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute("COMMIT")
     except Exception as e:
         results['errors'].append(f"Schema application failed: {e}")
         conn.close()
         return results
-    
+
     # Check results
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    results['tables_after'] = [row[0] for row in cursor.fetchall()]
-    
+    results['tables'] = [row[0] for row in cursor.fetchall()]
+
     cursor.execute("SELECT name FROM sqlite_master WHERE type='view'")
     results['views_created'] = [row[0] for row in cursor.fetchall()]
-    
+
     cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_collab%'")
     results['indexes_created'] = [row[0] for row in cursor.fetchall()]
-    
+
     conn.close()
     return results
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Apply Epic #234 schema extension')
-    parser.add_argument('--db', type=Path, required=True,
-                        help='Path to evaluation_results.db')
-    
-    args = parser.parse_args()
-    
-    if not args.db.exists():
-        print(f"Error: Database not found: {args.db}")
-        return 1
-    
-    results = apply_schema(args.db)
-    
+def apply_schema_many(db_paths: list, include_indexes: bool = True) -> dict:
+    """Apply the schema extension to many databases, parsing the SQL once.
+
+    Useful for bulk provisioning: the schema files are read and split into
+    statements a single time instead of once per database.
+
+    Args:
+        db_paths: Paths to evaluation_results.db files
+        include_indexes: Also create the secondary indexes (default)
+
+    Returns:
+        Dict mapping each path to its apply_schema() results
+    """
+    statements = _load_statements(include_indexes)
+    return {db_path: apply_schema(db_path, statements) for db_path in db_paths}
+
+
+def _report(db_path: Path, results: dict) -> int:
+    """Print the outcome for one database; returns 1 on errors."""
     if results['errors']:
         print("ERRORS:")
         for error in results['errors']:
             print(f"  - {error}")
         return 1
-    
-    new_tables = set(results['tables_after']) - set(results['tables_before'])
-    
-    print(f"Schema applied successfully to: {args.db}")
-    print(f"  New tables: {', '.join(new_tables) if new_tables else '(none, already existed)'}") 
+
+    print(f"Schema applied successfully to: {db_path}")
+    print(f"  Tables: {', '.join(results['tables'])}")
     print(f"  Views: {', '.join(results['views_created'])}")
     print(f"  Indexes: {', '.join(results['indexes_created'])}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply Epic #234 schema extension')
+    parser.add_argument('--db', type=Path, required=True, nargs='+',
+                        help='Path(s) to evaluation_results.db')
+    parser.add_argument('--no-indexes', action='store_true',
+                        help='Skip secondary index creation (build them after '
+                             'a bulk import by re-running without this flag)')
+
+    args = parser.parse_args()
+
+    for db_path in args.db:
+        if not db_path.exists():
+            print(f"Error: Database not found: {db_path}")
+            return 1
+
+    exit_code = 0
+    for db_path, results in apply_schema_many(args.db, not args.no_indexes).items():
+        exit_code |= _report(db_path, results)
+    return exit_code
 
 
 if __name__ == '__main__':
@@ -19,85 +19,235 @@ Examples:
 """
 
 import argparse
+import shutil
 import sqlite3
-import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from db_utils import tune_connection
+
+# SQL expression projecting instruction file names out of the actual_routing
+# JSON column. Handles both {"file": ...} objects and bare string entries,
+# and degrades to '[]' for NULL, malformed, or non-array values — same
+# semantics as the old Python-side parsing, but done in SQLite's C JSON1 code.
+ROUTED_INSTRUCTIONS_SQL = """
+    COALESCE(
+        CASE WHEN json_valid(e.actual_routing) AND json_type(e.actual_routing) = 'array'
+             THEN (
+                 SELECT json_group_array(
+                     CASE WHEN v.type = 'text' THEN v.value
+                          ELSE json_extract(v.value, '$.file') END)
+                 FROM json_each(e.actual_routing) v
+                 WHERE v.type = 'text'
+                    OR (v.type = 'object' AND json_extract(v.value, '$.file') IS NOT NULL)
+             )
+        END,
+        '[]'
+    )
+"""
+
+# One export line per row, built entirely inside SQLite: json_object emits
+# the final JSON string so Python only has to write it out.
+EVENT_JSON_SQL = f"""
+    json_object(
+        'event_id', e.event_id,
+        'user_message', e.user_message,
+        'timestamp', e.timestamp,
+        'session_id', e.session_id,
+        'task_phase', e.task_phase,
+        'work_context', e.work_context,
+        'routed_instructions', json({ROUTED_INSTRUCTIONS_SQL}),
+        'ground_truth_label', e.ground_truth_label,
+        'evidence_type', e.evidence_type
+    )
+"""
+
+
+def _open_output(path: Path, compress: str = 'auto'):
+    """Open an export output file, compressing according to `compress`.
+
+    'auto' picks the codec from the file extension (.gz / .zst), 'none'
+    writes plain bytes. zstd needs the optional zstandard package.
+    """
+    if compress == 'auto':
+        compress = {'.gz': 'gz', '.zst': 'zst'}.get(path.suffix, 'none')
+
+    if compress == 'gz':
+        import gzip
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compress == 'zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit(
+                "zstd output requires the zstandard package (pip install zstandard)"
+            )
+        return zstandard.ZstdCompressor(level=3).stream_writer(
+            open(path, 'wb'), closefd=True
+        )
+    # 1 MiB write buffer: far fewer write() syscalls than the 8 KiB default
+    return open(path, 'wb', buffering=1 << 20)
+
+
+def _export_shard(db_path: str, part_path: str, untagged_only: bool,
+                  lo: int, hi: int, compress: str = 'none') -> int:
+    """Worker: export events with rowid in [lo, hi] to a shard file.
+
+    Runs in its own process with its own read connection, so N workers can
+    scan disjoint rowid ranges of the WAL-mode database concurrently.
+    """
+    conn = sqlite3.connect(db_path)
+    tune_connection(conn)
+    cursor = conn.cursor()
+
+    query = f"""
+        SELECT {EVENT_JSON_SQL}
+        FROM evaluation_dataset e
+        WHERE e.rowid BETWEEN ? AND ?
+    """
+    if untagged_only:
+        query += """
+            AND NOT EXISTS (
+                SELECT 1 FROM collaboration_tags c WHERE c.event_id = e.event_id
+            )
+        """
+    query += " ORDER BY e.timestamp"
+
+    count = 0
+    with _open_output(Path(part_path), compress) as f:
+        for (event_json,) in cursor.execute(query, (lo, hi)):
+            f.write(event_json.encode('utf-8'))
+            f.write(b'\n')
+            count += 1
+
+    conn.close()
+    return count
+
+
+def _export_parallel(
+    db_path: Path,
+    output_path: Path,
+    untagged_only: bool,
+    jobs: int,
+    compress: str = 'auto'
+) -> int:
+    """Export with N worker processes over disjoint rowid ranges.
+
+    Each shard is written to its own part file, then the parts are
+    concatenated (gzip members and zstd frames concatenate into valid
+    streams, so compressed parts need no re-encode). Events are
+    timestamp-ordered within a shard but not across shards.
+    """
+    if compress == 'auto':
+        compress = {'.gz': 'gz', '.zst': 'zst'}.get(output_path.suffix, 'none')
+    conn = sqlite3.connect(db_path)
+    tune_connection(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(rowid), MAX(rowid) FROM evaluation_dataset")
+    min_id, max_id = cursor.fetchone()
+    conn.close()
+
+    if min_id is None:
+        # Empty table: just truncate the output
+        open(output_path, 'wb').close()
+        return 0
+
+    span = max_id - min_id + 1
+    step = (span + jobs - 1) // jobs
+    ranges = [(min_id + i * step, min(min_id + (i + 1) * step - 1, max_id))
+              for i in range(jobs) if min_id + i * step <= max_id]
+
+    parts = [output_path.with_suffix(f'{output_path.suffix}.part{i}')
+             for i in range(len(ranges))]
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        counts = list(pool.map(
+            _export_shard,
+            [str(db_path)] * len(ranges),
+            [str(p) for p in parts],
+            [untagged_only] * len(ranges),
+            [lo for lo, _ in ranges],
+            [hi for _, hi in ranges],
+            [compress] * len(ranges)
+        ))
+
+    with open(output_path, 'wb', buffering=1 << 20) as out:
+        for part in parts:
+            with open(part, 'rb') as src:
+                shutil.copyfileobj(src, out)
+            part.unlink()
+
+    return sum(counts)
+
 
 def export_events(
     db_path: Path,
     output_path: Path,
     untagged_only: bool = False,
-    limit: int = None
+    limit: int = None,
+    jobs: int = 1,
+    compress: str = 'auto'
 ) -> int:
     """Export events from evaluation_dataset to JSONL for tagging.
-    
+
     Args:
         db_path: Path to evaluation_results.db
         output_path: Output JSONL path
         untagged_only: If True, only export events without collaboration_tags
         limit: Maximum number to export
-        
+        jobs: Number of parallel export processes (ignored when limit is set)
+        compress: Output codec — 'auto' (by extension), 'none', 'gz', 'zst'
+
     Returns:
         Number of events exported
     """
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    tune_connection(conn)
     cursor = conn.cursor()
     
     # Check if collaboration_tags table exists
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='collaboration_tags'")
     has_collab_tags = cursor.fetchone() is not None
-    
+
+    if jobs > 1 and not limit:
+        conn.close()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return _export_parallel(
+            db_path, output_path, untagged_only and has_collab_tags, jobs, compress
+        )
+
     if untagged_only and has_collab_tags:
-        query = """
-            SELECT e.*
+        query = f"""
+            SELECT {EVENT_JSON_SQL}
             FROM evaluation_dataset e
-            LEFT JOIN collaboration_tags c ON e.event_id = c.event_id
-            WHERE c.id IS NULL
+            WHERE NOT EXISTS (
+                SELECT 1 FROM collaboration_tags c WHERE c.event_id = e.event_id
+            )
             ORDER BY e.timestamp
         """
     else:
-        query = "SELECT * FROM evaluation_dataset ORDER BY timestamp"
-    
-    if limit:
-        query += f" LIMIT {limit}"
-    
-    cursor.execute(query)
-    rows = cursor.fetchall()
+        query = f"""
+            SELECT {EVENT_JSON_SQL}
+            FROM evaluation_dataset e
+            ORDER BY e.timestamp
+        """
     
+    # Always bind LIMIT (-1 means unlimited in SQLite) so the statement
+    # text stays constant and cacheable, and the value is never interpolated
+    query += " LIMIT ?"
+    cursor.execute(query, (limit if limit else -1,))
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     count = 0
-    with open(output_path, 'w') as f:
-        for row in rows:
-            # Parse actual_routing JSON to get instruction names
-            actual_routing = []
-            try:
-                routing_data = json.loads(row['actual_routing'] or '[]')
-                if isinstance(routing_data, list):
-                    for item in routing_data:
-                        if isinstance(item, dict) and 'file' in item:
-                            actual_routing.append(item['file'])
-                        elif isinstance(item, str):
-                            actual_routing.append(item)
-            except json.JSONDecodeError:
-                pass
-            
-            event = {
-                'event_id': row['event_id'],
-                'user_message': row['user_message'],
-                'timestamp': row['timestamp'],
-                'session_id': row['session_id'],
-                'task_phase': row['task_phase'],
-                'work_context': row['work_context'],
-                'routed_instructions': actual_routing,
-                'ground_truth_label': row['ground_truth_label'],
-                'evidence_type': row['evidence_type']
-            }
-            f.write(json.dumps(event) + '\n')
+    with _open_output(output_path, compress) as f:
+        # Stream rows off the cursor instead of materializing the whole
+        # result set with fetchall()
+        for (event_json,) in cursor:
+            f.write(event_json.encode('utf-8'))
+            f.write(b'\n')
             count += 1
-    
+
     conn.close()
     return count
 
@@ -109,14 +259,22 @@ def main():
     parser.add_argument('--untagged-only', action='store_true',
                         help='Only export events without collaboration tags')
     parser.add_argument('--limit', type=int, help='Maximum events to export')
-    
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Parallel export processes; output is ordered per '
+                             'shard, not globally (ignored with --limit)')
+    parser.add_argument('--compress', choices=['auto', 'none', 'gz', 'zst'],
+                        default='auto',
+                        help='Compress output; auto picks by extension '
+                             '(.jsonl.gz / .jsonl.zst)')
+
     args = parser.parse_args()
-    
+
     if not args.db.exists():
         print(f"Error: Database not found: {args.db}")
         return 1
-    
-    count = export_events(args.db, args.output, args.untagged_only, args.limit)
+
+    count = export_events(args.db, args.output, args.untagged_only, args.limit,
+                          args.jobs, args.compress)
     print(f"Exported {count} events to {args.output}")
 
 
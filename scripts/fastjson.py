@@ -0,0 +1,29 @@
+"""
+JSON helpers for the JSONL hot loops, with an optional orjson fast path.
+
+orjson parses and serializes several times faster than stdlib json; fall
+back to stdlib when it isn't installed. dumps() always returns bytes so
+callers can write JSONL files opened in binary mode either way.
+"""
+
+try:
+    import orjson as _orjson
+
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return _orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to JSON bytes."""
+        return _orjson.dumps(obj)
+
+except ImportError:
+    import json as _json
+
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return _json.loads(data)
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to JSON bytes."""
+        return _json.dumps(obj).encode('utf-8')
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Populate evaluation_dataset from a Pongogo routing_events observability DB.
+
+Copies routing events into evaluation_results.db as evaluation_dataset rows
+(event_id 'evt_NNNNNN' derived from the source id), extracting the routed
+instruction names from formatted_context. Re-runnable: events that already
+exist in the target are skipped.
+
+Usage:
+    python populate_from_routing.py --source-db PATH --db PATH
+
+Examples:
+    python populate_from_routing.py \
+        --source-db ~/.observability_db/observability_db-learning/routing_events.db \
+        --db ~/.observability_db/observability_db-learning/evaluation_results.db
+"""
+
+import argparse
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fastjson
+from db_utils import tune_connection
+
+
+# Source rows fetched (and inserted) per batch
+BATCH_SIZE = 10000
+
+# Shard DBs merged per ATTACH group; SQLite's default limit on
+# concurrently attached databases is 10
+MAX_ATTACHED = 10
+
+_INSERT_PREFIX = (
+    "INSERT OR IGNORE INTO evaluation_dataset "
+    "(event_id, user_message, timestamp, session_id, actual_routing) VALUES "
+)
+_VALUES_ROW = "(?, ?, ?, ?, ?)"
+
+# Rows per multi-row VALUES statement: 5 bind variables each against
+# SQLite's default 999-variable limit
+ROWS_PER_INSERT = 999 // 5
+
+# Constant SQL text for full chunks, so pysqlite's statement cache reuses
+# one prepared statement; only the final short chunk builds its own
+_FULL_INSERT_SQL = _INSERT_PREFIX + ", ".join([_VALUES_ROW] * ROWS_PER_INSERT)
+
+_SOURCE_SELECT = """
+    SELECT id, message_clean, message_excerpt, timestamp, session_id, formatted_context
+    FROM routing_events
+"""
+SOURCE_QUERY = _SOURCE_SELECT + " ORDER BY id"
+SHARD_SOURCE_QUERY = _SOURCE_SELECT + " WHERE id % ? = ? ORDER BY id"
+
+# Shard temp DBs carry just the columns we populate, with no PK or indexes:
+# the final INSERT OR IGNORE into the real table does the deduplication
+SHARD_TABLE_SQL = """
+    CREATE TABLE evaluation_dataset (
+        event_id TEXT,
+        user_message TEXT,
+        timestamp TEXT,
+        session_id TEXT,
+        actual_routing TEXT
+    )
+"""
+
+# Compiled once: skips re's per-call cache lookup in the batch hot loop
+_INSTR_RE = re.compile(r'### \d+\. (\w+\.instructions)')
+
+
+def extract_instructions(formatted_context: str) -> list:
+    """Extract routed instruction file names from a formatted context blob.
+
+    Instructions appear as numbered section headers, e.g.
+    '### 1. issue_closure.instructions'.
+    """
+    if not formatted_context:
+        return []
+    return _INSTR_RE.findall(formatted_context)
+
+
+def _insert_batch(conn, cursor, stats: dict, batch: list):
+    """Insert a batch via executemany, skipping events that already exist.
+
+    INSERT OR IGNORE drops event_id conflicts inside SQLite, so re-running
+    an import never raises per-row IntegrityError; the skip count falls
+    out of the connection's total_changes delta.
+
+    Rows go in as multi-row VALUES statements (ROWS_PER_INSERT rows per
+    execute): one VDBE program run covers a whole chunk, where executemany
+    re-runs the single-row program per row.
+    """
+    changes_before = conn.total_changes
+    for i in range(0, len(batch), ROWS_PER_INSERT):
+        chunk = batch[i:i + ROWS_PER_INSERT]
+        if len(chunk) == ROWS_PER_INSERT:
+            sql = _FULL_INSERT_SQL
+        else:
+            sql = _INSERT_PREFIX + ", ".join([_VALUES_ROW] * len(chunk))
+        cursor.execute(sql, [value for row in chunk for value in row])
+    inserted = conn.total_changes - changes_before
+    stats['inserted'] += inserted
+    stats['skipped_existing'] += len(batch) - inserted
+
+
+def _copy_rows(source_cursor, target_conn, target_cursor, stats: dict):
+    """Drain source_cursor into the target, one transaction per batch."""
+    # Loop invariants hoisted to locals: the tuple builder runs once per
+    # source row, and global/method lookups inside it add up at that rate
+    extract = extract_instructions
+    dumps = fastjson.dumps
+
+    # Fetch and insert in batches: one prepared statement + one transaction
+    # per BATCH_SIZE rows instead of per-row autocommit round-trips
+    while True:
+        rows = source_cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            break
+        stats['source_count'] += len(rows)
+
+        # Positional unpacking in source column order: no per-access
+        # column-name lookup the way sqlite3.Row indexing would do.
+        # Empty columns become SQL NULL: no regex/dumps work for rows with
+        # no context, and NULL stores in the record header where '' / '[]'
+        # cost page bytes. Readers already degrade NULL actual_routing to
+        # '[]' (see export_for_tagging.ROUTED_INSTRUCTIONS_SQL).
+        batch = []
+        append = batch.append
+        for rid, message_clean, message_excerpt, timestamp, session_id, formatted_context in rows:
+            append((
+                f"evt_{rid:06d}",
+                message_clean or message_excerpt or None,
+                timestamp,
+                session_id,
+                dumps(extract(formatted_context)).decode('utf-8')
+                if formatted_context else None
+            ))
+
+        target_cursor.execute("BEGIN IMMEDIATE")
+        try:
+            _insert_batch(target_conn, target_cursor, stats, batch)
+            target_cursor.execute("COMMIT")
+        except Exception as e:
+            target_cursor.execute("ROLLBACK")
+            stats['errors'].append(f"Batch insert failed: {e}")
+
+
+def _populate_shard(source_db: str, shard_path: str, shards: int,
+                    shard_id: int) -> int:
+    """Worker: copy rows with id % shards == shard_id into a shard DB.
+
+    Runs in its own process with its own connections, so N workers read
+    the source concurrently and each writes its own file — no contention
+    on SQLite's single-writer lock.
+    """
+    source_conn = sqlite3.connect(source_db)
+    tune_connection(source_conn)
+    source_cursor = source_conn.cursor()
+    source_cursor.arraysize = BATCH_SIZE
+    source_cursor.execute(SHARD_SOURCE_QUERY, (shards, shard_id))
+
+    shard_conn = sqlite3.connect(shard_path, isolation_level=None)
+    tune_connection(shard_conn)
+    shard_cursor = shard_conn.cursor()
+    shard_cursor.execute(SHARD_TABLE_SQL)
+
+    stats = {'source_count': 0, 'inserted': 0, 'skipped_existing': 0, 'errors': []}
+    _copy_rows(source_cursor, shard_conn, shard_cursor, stats)
+
+    source_conn.close()
+    shard_conn.close()
+    return stats['source_count']
+
+
+def _populate_sharded(source_db: Path, target_db: Path, shards: int) -> dict:
+    """Populate with N worker processes sharded by source id.
+
+    Each worker writes an unindexed shard DB; the finalize step ATTACHes
+    them all and merges with INSERT OR IGNORE ... SELECT inside a single
+    transaction on the target, which is the only writer to touch it.
+    """
+    stats = {
+        'source_count': 0,
+        'inserted': 0,
+        'skipped_existing': 0,
+        'errors': []
+    }
+
+    # Same friendly failure as the serial path when the source is missing
+    # the table — probed up front so no workers are spawned for nothing
+    try:
+        probe = sqlite3.connect(source_db)
+        probe.execute("SELECT 1 FROM routing_events LIMIT 1")
+        probe.close()
+    except sqlite3.OperationalError as e:
+        stats['errors'].append(f"Source query failed: {e}")
+        return stats
+
+    shard_paths = [Path(f"{target_db}.shard{k}") for k in range(shards)]
+    for path in shard_paths:
+        path.unlink(missing_ok=True)
+
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        counts = list(pool.map(
+            _populate_shard,
+            [str(source_db)] * shards,
+            [str(p) for p in shard_paths],
+            [shards] * shards,
+            range(shards)
+        ))
+    stats['source_count'] = sum(counts)
+
+    target_conn = sqlite3.connect(target_db, isolation_level=None)
+    tune_connection(target_conn)
+    cursor = target_conn.cursor()
+
+    # Merge in groups of at most MAX_ATTACHED shards — --shards follows
+    # core count, so values past SQLite's attach limit are normal. Each
+    # group merges in its own transaction; INSERT OR IGNORE keeps the
+    # result identical to a single-transaction merge, and the shard files
+    # are deleted even when a merge group fails.
+    changes_before = target_conn.total_changes
+    try:
+        for start in range(0, shards, MAX_ATTACHED):
+            group = range(start, min(start + MAX_ATTACHED, shards))
+            for k in group:
+                cursor.execute(f"ATTACH ? AS shard{k}", (str(shard_paths[k]),))
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for k in group:
+                    # main. qualifier: with shards attached, an unqualified
+                    # name could resolve into a shard's own table if the
+                    # target is missing evaluation_dataset
+                    cursor.execute(f"""
+                        INSERT OR IGNORE INTO main.evaluation_dataset
+                            (event_id, user_message, timestamp, session_id, actual_routing)
+                        SELECT event_id, user_message, timestamp, session_id, actual_routing
+                        FROM shard{k}.evaluation_dataset
+                    """)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            for k in group:
+                cursor.execute(f"DETACH shard{k}")
+        stats['inserted'] = target_conn.total_changes - changes_before
+        stats['skipped_existing'] = stats['source_count'] - stats['inserted']
+    except Exception as e:
+        stats['errors'].append(f"Shard merge failed: {e}")
+    finally:
+        # Close first so SQLite releases the shards, then sweep the files
+        # including WAL sidecars a failed merge can leave next to them
+        target_conn.close()
+        for path in shard_paths:
+            path.unlink(missing_ok=True)
+            for suffix in ('-wal', '-shm'):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    return stats
+
+
+def populate_events(source_db: Path, target_db: Path, shards: int = 1) -> dict:
+    """Copy routing_events from the source DB into evaluation_dataset.
+
+    Args:
+        source_db: Path to the observability routing_events database
+        target_db: Path to evaluation_results.db
+        shards: Worker processes for the copy; 1 (default) runs serially
+
+    Returns:
+        Dict with population statistics
+    """
+    if shards > 1:
+        return _populate_sharded(source_db, target_db, shards)
+
+    stats = {
+        'source_count': 0,
+        'inserted': 0,
+        'skipped_existing': 0,
+        'errors': []
+    }
+
+    source_conn = sqlite3.connect(source_db)
+    tune_connection(source_conn)
+    source_cursor = source_conn.cursor()
+
+    target_conn = sqlite3.connect(target_db, isolation_level=None)
+    tune_connection(target_conn)
+    target_cursor = target_conn.cursor()
+
+    # Hint pysqlite's fetch buffer to match the batch size
+    source_cursor.arraysize = BATCH_SIZE
+
+    try:
+        source_cursor.execute(SOURCE_QUERY)
+    except sqlite3.OperationalError as e:
+        stats['errors'].append(f"Source query failed: {e}")
+        source_conn.close()
+        target_conn.close()
+        return stats
+
+    _copy_rows(source_cursor, target_conn, target_cursor, stats)
+
+    source_conn.close()
+    target_conn.close()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Populate evaluation_dataset from routing events')
+    parser.add_argument('--source-db', type=Path, required=True,
+                        help='Path to routing_events observability database')
+    parser.add_argument('--db', type=Path, required=True,
+                        help='Path to evaluation_results.db')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Parallel copy processes; each writes a shard DB '
+                             'that is merged into the target at the end')
+
+    args = parser.parse_args()
+
+    if not args.source_db.exists():
+        print(f"Error: Source database not found: {args.source_db}")
+        return 1
+
+    if not args.db.exists():
+        print(f"Error: Database not found: {args.db}")
+        return 1
+
+    stats = populate_events(args.source_db, args.db, args.shards)
+
+    print(f"\nPopulation Statistics:")
+    print(f"  Source events: {stats['source_count']}")
+    print(f"  Inserted: {stats['inserted']}")
+    print(f"  Skipped (already present): {stats['skipped_existing']}")
+
+    if stats['errors']:
+        print(f"\nErrors ({len(stats['errors'])}):\n")
+        for error in stats['errors']:
+            print(f"  - {error}")
+        return 1
+
+
+if __name__ == '__main__':
+    main()
@@ -19,62 +19,181 @@ import argparse
 import sqlite3
 from pathlib import Path
 
+from db_utils import tune_connection
+
+
+ITERATION_RATE_HEADERS = ['Session', 'Events', 'Followups', 'Corrections', 'Iter Rate']
+ANTI_PATTERN_HEADERS = ['Anti-Pattern', 'Preventive Instr', 'Count', 'Routed', '% Instr Issue']
+REQUEST_TYPE_HEADERS = ['Request Type', 'Count', '% of Total', 'Success Rate']
+ITERATION_TYPE_HEADERS = ['Iteration Type', 'Count', '% of Total']
+
+# One pass over collaboration_tags for the default "all metrics" run: every
+# branch reads the base CTE, so SQLite materializes the table scan once
+# instead of walking the B-tree five times. Branches are padded to a common
+# width, tagged with their metric name, and carry a sort_key column so the
+# final ORDER BY reproduces each section's old per-query ordering.
+COMBINED_METRICS_SQL = """
+    WITH base AS (SELECT * FROM collaboration_tags),
+         totals AS (SELECT COUNT(*) AS n FROM base)
+    SELECT 'summary' AS metric, 0 AS sort_key,
+        (SELECT COUNT(*) FROM evaluation_dataset),
+        COUNT(DISTINCT event_id),
+        COUNT(DISTINCT tagger_id),
+        NULL, NULL
+    FROM base
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'iteration_rate',
+            ROUND(CAST(COUNT(*) AS FLOAT) /
+                NULLIF(SUM(CASE WHEN is_new_request THEN 1 ELSE 0 END), 0), 2),
+            tagged_session_id,
+            COUNT(*),
+            SUM(CASE WHEN is_followup THEN 1 ELSE 0 END),
+            SUM(CASE WHEN is_correction THEN 1 ELSE 0 END),
+            ROUND(CAST(COUNT(*) AS FLOAT) /
+                NULLIF(SUM(CASE WHEN is_new_request THEN 1 ELSE 0 END), 0), 2)
+        FROM base
+        GROUP BY tagged_session_id
+        ORDER BY 2 DESC
+        LIMIT 10
+    )
+    UNION ALL
+    SELECT 'anti_patterns', COUNT(*),
+        anti_pattern_type,
+        preventive_instruction,
+        COUNT(*),
+        SUM(CASE WHEN preventive_instruction_was_routed THEN 1 ELSE 0 END),
+        ROUND(100.0 * SUM(CASE WHEN preventive_instruction_was_routed THEN 1 ELSE 0 END) / COUNT(*), 1)
+    FROM base
+    WHERE anti_pattern_detected = 1
+    GROUP BY anti_pattern_type, preventive_instruction
+    UNION ALL
+    SELECT 'request_types', COUNT(*),
+        request_type,
+        COUNT(*),
+        ROUND(100.0 * COUNT(*) / totals.n, 1),
+        AVG(CASE WHEN outcome_observed = 'success' THEN 1.0 ELSE 0.0 END),
+        NULL
+    FROM base, totals
+    GROUP BY request_type
+    UNION ALL
+    SELECT 'iteration_types', COUNT(*),
+        iteration_type,
+        COUNT(*),
+        ROUND(100.0 * COUNT(*) / totals.n, 1),
+        NULL, NULL
+    FROM base, totals
+    GROUP BY iteration_type
+    ORDER BY metric, sort_key DESC
+"""
+
 
 def print_table(rows: list, headers: list):
     """Print rows as formatted table."""
     if not rows:
         print("  (no data)")
         return
-    
-    # Calculate column widths
-    widths = [len(h) for h in headers]
-    for row in rows:
-        for i, val in enumerate(row):
-            widths[i] = max(widths[i], len(str(val) if val is not None else 'NULL'))
-    
+
+    # Stringify every cell once; both the width pass and the output pass
+    # reuse the rendered values instead of rebuilding a str per cell
+    rendered = [['NULL' if val is None else str(val) for val in row] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in rendered)) for i, h in enumerate(headers)]
+
     # Print header
     header_line = " | ".join(h.ljust(widths[i]) for i, h in enumerate(headers))
     print(f"  {header_line}")
     print(f"  {'-' * len(header_line)}")
-    
+
     # Print rows
-    for row in rows:
-        row_line = " | ".join(
-            str(val if val is not None else 'NULL').ljust(widths[i]) 
-            for i, val in enumerate(row)
-        )
-        print(f"  {row_line}")
+    for row in rendered:
+        print(f"  {' | '.join(val.ljust(widths[i]) for i, val in enumerate(row))}")
+
+
+def _total_tags(cursor) -> int:
+    """Row count of collaboration_tags, computed once per metric query.
+
+    Interpolated into the pct expressions as an integer literal so the
+    total isn't recomputed per output row. Clamped to 1 when the table is
+    empty — the GROUP BY yields no rows then anyway, and a 0 divisor would
+    make every pct NULL if a row somehow raced in.
+    """
+    total = cursor.execute("SELECT COUNT(*) FROM collaboration_tags").fetchone()[0]
+    return max(total, 1)
+
+
+def _print_summary(total_events, tagged_events, tagger_count):
+    print("\n=== SUMMARY ===")
+    print(f"  Total events in evaluation_dataset: {total_events}")
+    print(f"  Events with collaboration tags: {tagged_events} ({100*tagged_events/total_events:.1f}%)")
+    print(f"  Unique taggers: {tagger_count}")
+
+
+def _print_anti_patterns(rows):
+    print("\n=== ANTI-PATTERN ANALYSIS ===")
+    if rows:
+        print_table(rows, ANTI_PATTERN_HEADERS)
+        print("\n  Legend: pct_instr_issue = cases where instruction was routed but anti-pattern still occurred")
+    else:
+        print("  (no anti-patterns tagged yet)")
+
+
+def _query_all_metrics(cursor):
+    """Print every metric section off the single combined statement."""
+    sections = {}
+    cursor.execute(COMBINED_METRICS_SQL)
+    for metric_name, _sort_key, *values in cursor.fetchall():
+        sections.setdefault(metric_name, []).append(values)
+
+    _print_summary(*sections['summary'][0][:3])
+
+    print("\n=== ITERATION RATE BY SESSION ===")
+    print_table([r[:5] for r in sections.get('iteration_rate', [])],
+                ITERATION_RATE_HEADERS)
+
+    _print_anti_patterns([r[:5] for r in sections.get('anti_patterns', [])])
+
+    print("\n=== REQUEST TYPE BREAKDOWN ===")
+    print_table([r[:4] for r in sections.get('request_types', [])],
+                REQUEST_TYPE_HEADERS)
+
+    print("\n=== ITERATION TYPE BREAKDOWN ===")
+    print_table([r[:3] for r in sections.get('iteration_types', [])],
+                ITERATION_TYPE_HEADERS)
 
 
 def query_metrics(db_path: Path, metric: str = None):
     """Query and display collaboration efficiency metrics."""
-    
+
     conn = sqlite3.connect(db_path)
+    tune_connection(conn)
     cursor = conn.cursor()
-    
+
     # Check if collaboration_tags exists
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='collaboration_tags'")
     if not cursor.fetchone():
         print("Error: collaboration_tags table not found.")
         print("Run: python scripts/apply_schema.py --db PATH")
         return
-    
+
+    # No metric selected: compute everything in one pass
+    if metric is None:
+        _query_all_metrics(cursor)
+        conn.close()
+        return
+
     # Overall stats
-    if metric is None or metric == 'summary':
-        print("\n=== SUMMARY ===")
+    if metric == 'summary':
         cursor.execute("SELECT COUNT(*) FROM evaluation_dataset")
         total_events = cursor.fetchone()[0]
         cursor.execute("SELECT COUNT(DISTINCT event_id) FROM collaboration_tags")
         tagged_events = cursor.fetchone()[0]
         cursor.execute("SELECT COUNT(DISTINCT tagger_id) FROM collaboration_tags")
         tagger_count = cursor.fetchone()[0]
-        
-        print(f"  Total events in evaluation_dataset: {total_events}")
-        print(f"  Events with collaboration tags: {tagged_events} ({100*tagged_events/total_events:.1f}%)")
-        print(f"  Unique taggers: {tagger_count}")
-    
+
+        _print_summary(total_events, tagged_events, tagger_count)
+
     # Session statistics (iteration rate)
-    if metric is None or metric == 'iteration_rate':
+    if metric == 'iteration_rate':
         print("\n=== ITERATION RATE BY SESSION ===")
         cursor.execute("""
             SELECT 
@@ -89,14 +208,10 @@ def query_metrics(db_path: Path, metric: str = None):
             ORDER BY iteration_rate DESC
             LIMIT 10
         """)
-        print_table(
-            cursor.fetchall(),
-            ['Session', 'Events', 'Followups', 'Corrections', 'Iter Rate']
-        )
-    
+        print_table(cursor.fetchall(), ITERATION_RATE_HEADERS)
+
     # Anti-pattern analysis
-    if metric is None or metric == 'anti_patterns':
-        print("\n=== ANTI-PATTERN ANALYSIS ===")
+    if metric == 'anti_patterns':
         cursor.execute("""
             SELECT 
                 anti_pattern_type,
@@ -109,48 +224,39 @@ def query_metrics(db_path: Path, metric: str = None):
             GROUP BY anti_pattern_type, preventive_instruction
             ORDER BY count DESC
         """)
-        rows = cursor.fetchall()
-        if rows:
-            print_table(rows, ['Anti-Pattern', 'Preventive Instr', 'Count', 'Routed', '% Instr Issue'])
-            print("\n  Legend: pct_instr_issue = cases where instruction was routed but anti-pattern still occurred")
-        else:
-            print("  (no anti-patterns tagged yet)")
-    
+        _print_anti_patterns(cursor.fetchall())
+
     # Request type breakdown
-    if metric is None or metric == 'request_types':
+    if metric == 'request_types':
         print("\n=== REQUEST TYPE BREAKDOWN ===")
-        cursor.execute("""
-            SELECT 
+        total_tags = _total_tags(cursor)
+        cursor.execute(f"""
+            SELECT
                 request_type,
                 COUNT(*) as count,
-                ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM collaboration_tags), 1) as pct,
+                ROUND(100.0 * COUNT(*) / {total_tags}, 1) as pct,
                 AVG(CASE WHEN outcome_observed = 'success' THEN 1.0 ELSE 0.0 END) as success_rate
             FROM collaboration_tags
             GROUP BY request_type
             ORDER BY count DESC
         """)
-        print_table(
-            cursor.fetchall(),
-            ['Request Type', 'Count', '% of Total', 'Success Rate']
-        )
-    
+        print_table(cursor.fetchall(), REQUEST_TYPE_HEADERS)
+
     # Iteration type breakdown
-    if metric is None or metric == 'iteration_types':
+    if metric == 'iteration_types':
         print("\n=== ITERATION TYPE BREAKDOWN ===")
-        cursor.execute("""
-            SELECT 
+        total_tags = _total_tags(cursor)
+        cursor.execute(f"""
+            SELECT
                 iteration_type,
                 COUNT(*) as count,
-                ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM collaboration_tags), 1) as pct
+                ROUND(100.0 * COUNT(*) / {total_tags}, 1) as pct
             FROM collaboration_tags
             GROUP BY iteration_type
             ORDER BY count DESC
         """)
-        print_table(
-            cursor.fetchall(),
-            ['Iteration Type', 'Count', '% of Total']
-        )
-    
+        print_table(cursor.fetchall(), ITERATION_TYPE_HEADERS)
+
     conn.close()
 
 
@@ -10,11 +10,13 @@ Examples:
 """
 
 import argparse
-import json
+import array
 import sys
 from pathlib import Path
 from collections import defaultdict
 
+import fastjson
+
 
 REQUIRED_FIELDS = [
     'is_new_request',
@@ -29,6 +31,33 @@ REQUIRED_FIELDS = [
 VALID_REQUEST_TYPES = ['procedural', 'query', 'action', 'meta', 'unclear']
 VALID_CONFIDENCE = ['high', 'medium', 'low']
 
+# Upper bound on request_sequence: anything past this is garbage input, and
+# it keeps values inside the signed 32-bit session arrays below
+MAX_SEQUENCE = 2**31 - 1
+
+# Deferred formatting: the hot loop records (code, args...) tuples and the
+# report renders only the lines actually shown, so clean files build no
+# per-row message strings
+_MESSAGES = {
+    'invalid_json': "Line {0}: Invalid JSON - {1}",
+    'missing_event_id': "Line {0}: Missing 'event_id'",
+    'duplicate_event_id': "Line {0}: Duplicate event_id '{1}'",
+    'missing_tags': "Line {0} ({1}): Missing 'tags'",
+    'missing_field': "Line {0} ({1}): Missing required field '{2}'",
+    'bad_bool': "Line {0} ({1}): '{2}' must be boolean, got {3}",
+    'bad_request_type': "Line {0} ({1}): Invalid request_type '{2}'. Must be one of: {3}",
+    'bad_sequence': "Line {0} ({1}): request_sequence must be positive integer (max {2})",
+    'session_id_format': "Line {0} ({1}): session_id '{2}' doesn't follow 'session_NNN' format",
+    'bad_confidence': "Line {0} ({1}): Invalid confidence '{2}'. Should be one of: {3}",
+    'non_sequential': "Session '{0}': Non-sequential request_sequence. Expected {1}, got {2} for {3}",
+}
+
+
+def format_issue(issue: tuple) -> str:
+    """Render one recorded error/warning tuple to its message string."""
+    code, *args = issue
+    return _MESSAGES[code].format(*args)
+
 
 def validate_tags(input_path: str) -> dict:
     """Validate tagged events file.
@@ -44,107 +73,116 @@ def validate_tags(input_path: str) -> dict:
         'valid': 0,
         'errors': [],
         'warnings': [],
-        'sessions': defaultdict(list)  # session_id -> [(seq, event_id)]
+        # session_id -> packed int sequences; C-int storage and a C-level
+        # sort in the final monotonicity pass instead of Python tuples
+        'sessions': defaultdict(lambda: array.array('i'))
     }
-    
+
     seen_event_ids = set()
-    
-    with open(input_path) as f:
+    # session_id -> {seq: event_id} so gap warnings can still name the event
+    event_by_seq = defaultdict(dict)
+
+    # Binary read: json.loads accepts bytes, so lines skip UTF-8 decode,
+    # and nothing beyond event ids and session sequences is accumulated —
+    # validation streams files larger than RAM
+    with open(input_path, 'rb') as f:
         for line_num, line in enumerate(f, 1):
             results['total'] += 1
             
             # Parse JSON
             try:
-                event = json.loads(line)
-            except json.JSONDecodeError as e:
-                results['errors'].append(f"Line {line_num}: Invalid JSON - {e}")
+                event = fastjson.loads(line)
+            except ValueError as e:
+                results['errors'].append(('invalid_json', line_num, e))
                 continue
-            
+
             # Check required top-level fields
             if 'event_id' not in event:
-                results['errors'].append(f"Line {line_num}: Missing 'event_id'")
+                results['errors'].append(('missing_event_id', line_num))
                 continue
-            
+
             event_id = event['event_id']
-            
+
             # Check for duplicates
             if event_id in seen_event_ids:
-                results['errors'].append(f"Line {line_num}: Duplicate event_id '{event_id}'")
+                results['errors'].append(('duplicate_event_id', line_num, event_id))
             seen_event_ids.add(event_id)
-            
+
             if 'tags' not in event:
-                results['errors'].append(f"Line {line_num} ({event_id}): Missing 'tags'")
+                results['errors'].append(('missing_tags', line_num, event_id))
                 continue
-            
+
             tags = event['tags']
             line_valid = True
-            
+
             # Check required tag fields
             for field in REQUIRED_FIELDS:
                 if field not in tags:
-                    results['errors'].append(
-                        f"Line {line_num} ({event_id}): Missing required field '{field}'"
-                    )
+                    results['errors'].append(('missing_field', line_num, event_id, field))
                     line_valid = False
-            
+
             if not line_valid:
                 continue
-            
+
             # Validate field types and values
             for bool_field in ['is_new_request', 'is_followup', 'is_correction']:
                 if not isinstance(tags[bool_field], bool):
                     results['errors'].append(
-                        f"Line {line_num} ({event_id}): '{bool_field}' must be boolean, got {type(tags[bool_field]).__name__}"
+                        ('bad_bool', line_num, event_id, bool_field,
+                         type(tags[bool_field]).__name__)
                     )
                     line_valid = False
-            
+
             if tags['request_type'] not in VALID_REQUEST_TYPES:
                 results['errors'].append(
-                    f"Line {line_num} ({event_id}): Invalid request_type '{tags['request_type']}'. "
-                    f"Must be one of: {VALID_REQUEST_TYPES}"
+                    ('bad_request_type', line_num, event_id, tags['request_type'],
+                     VALID_REQUEST_TYPES)
                 )
                 line_valid = False
-            
-            if not isinstance(tags['request_sequence'], int) or tags['request_sequence'] < 1:
+
+            seq = tags['request_sequence']
+            seq_ok = isinstance(seq, int) and 1 <= seq <= MAX_SEQUENCE
+            if not seq_ok:
                 results['errors'].append(
-                    f"Line {line_num} ({event_id}): request_sequence must be positive integer"
+                    ('bad_sequence', line_num, event_id, MAX_SEQUENCE)
                 )
                 line_valid = False
-            
+
             # Validate session_id format
             if not tags['session_id'].startswith('session_'):
                 results['warnings'].append(
-                    f"Line {line_num} ({event_id}): session_id '{tags['session_id']}' "
-                    "doesn't follow 'session_NNN' format"
+                    ('session_id_format', line_num, event_id, tags['session_id'])
                 )
-            
+
             # Validate optional confidence field
             if 'confidence' in tags and tags['confidence'] not in VALID_CONFIDENCE:
                 results['warnings'].append(
-                    f"Line {line_num} ({event_id}): Invalid confidence '{tags['confidence']}'. "
-                    f"Should be one of: {VALID_CONFIDENCE}"
+                    ('bad_confidence', line_num, event_id, tags['confidence'],
+                     VALID_CONFIDENCE)
                 )
             
-            # Track session sequences for ordering validation
-            results['sessions'][tags['session_id']].append(
-                (tags['request_sequence'], event_id)
-            )
-            
+            # Track session sequences for ordering validation (only values
+            # that fit the array — bad sequences were flagged above)
+            if seq_ok:
+                session_id = tags['session_id']
+                results['sessions'][session_id].append(seq)
+                event_by_seq[session_id][seq] = event_id
+
             if line_valid:
                 results['valid'] += 1
-    
+
     # Validate session sequences are monotonic
-    for session_id, events in results['sessions'].items():
-        sorted_events = sorted(events, key=lambda x: x[0])
+    for session_id, seqs in results['sessions'].items():
+        event_ids = event_by_seq[session_id]
         prev_seq = 0
-        for seq, event_id in sorted_events:
+        for seq in sorted(seqs):
             if seq != prev_seq + 1:
                 results['warnings'].append(
-                    f"Session '{session_id}': Non-sequential request_sequence. "
-                    f"Expected {prev_seq + 1}, got {seq} for {event_id}"
+                    ('non_sequential', session_id, prev_seq + 1, seq,
+                     event_ids[seq])
                 )
             prev_seq = seq
-    
+
     return results
 
 
@@ -169,14 +207,14 @@ def main():
     if results['errors']:
         print(f"\n❌ ERRORS ({len(results['errors'])}):\n")
         for error in results['errors'][:20]:
-            print(f"  {error}")
+            print(f"  {format_issue(error)}")
         if len(results['errors']) > 20:
             print(f"  ... and {len(results['errors']) - 20} more errors")
-    
+
     if results['warnings']:
         print(f"\n⚠️  WARNINGS ({len(results['warnings'])}):\n")
         for warning in results['warnings'][:10]:
-            print(f"  {warning}")
+            print(f"  {format_issue(warning)}")
         if len(results['warnings']) > 10:
             print(f"  ... and {len(results['warnings']) - 10} more warnings")
     